@@ -4,10 +4,25 @@ import requests
 from datetime import datetime, timedelta
 from collections import defaultdict
 import plotly.express as px
+import plotly.io as pio
 import json
 from babel.dates import format_datetime
 from unidecode import unidecode
 
+# orjson serializa arrays NumPy nativamente e é bem mais rápido que o encoder padrão
+pio.json.config.default_engine = "orjson"
+
+# Mapear a opção selecionada para um número de dias
+DAYS_MAP = {
+    "Por semana": 7,
+    "Por mês": 30,
+    "Por trimestre": 90
+}
+
+# Execuções brutas são mantidas só nesta janela recente; as mais antigas são
+# compactadas em totais por dia × estado × hora
+RAW_RETENTION_DAYS = 90
+
 def loading_html(file="app.html"):
     # Carrega o conteúdo HTML do arquivo
     with open(file, 'r') as f:
@@ -15,21 +30,32 @@ def loading_html(file="app.html"):
 
     return html_string
 
-@st.cache_data(ttl=60*5) # 5 minutos
+# Sem cache: só o resultado compactado de loading_data fica em memória
 def fetch_data():
     url = "https://apiresidenciaadministrativa.jfal.jus.br/api/v1/execution"
-    response = requests.get(url)
+    response = requests.get(url, timeout=60)
     return response.json()
 
+def compact_data(df, retention_days=RAW_RETENTION_DAYS):
+    # 'quantidade' = número de execuções representadas por cada linha (1 para as brutas)
+    cutoff = pd.Timestamp.now(tz=df['timeStamp'].dt.tz).normalize() - pd.Timedelta(days=retention_days)
+    recent = df[df['timeStamp'] >= cutoff].assign(quantidade=1)
+    old = df[df['timeStamp'] < cutoff]
+    old = old.groupby(['state', old['timeStamp'].dt.floor('h')], dropna=False).agg(**{
+        'Execuções realizadas': ('Execuções realizadas', 'sum'),
+        'quantidade': ('Execuções realizadas', 'size'),
+    }).reset_index()
+    return pd.concat([old, recent], ignore_index=True)
+
+@st.cache_data(ttl=60*5) # 5 minutos
 def loading_data():
-    data = fetch_data()
-    df = pd.DataFrame(data)
+    df = pd.DataFrame(fetch_data())
     df['timeStamp'] = pd.to_datetime(df['timeStamp']).dt.tz_convert('America/Sao_Paulo')
     df['duration'] = df['duration'].astype(float) 
     df = df.rename(columns={
         'duration': 'Execuções realizadas'
     })
-    return df
+    return compact_data(df)
 
 def process_data_type_visualization(df, type_data_visualization):
     cutoff_date = pd.Timestamp(2024, 8, 26).date()
@@ -44,7 +70,7 @@ def process_data_state(df, selected_state):
     return df
 
 def split_by_interval(df, interval, type_interval):
-    date_counts = df['timeStamp'].dt.date.value_counts()
+    date_counts = df.groupby(df['timeStamp'].dt.date)['quantidade'].sum()
     sorted_dates = sorted(date_counts.keys(), reverse=True)
 
     interval_dates = defaultdict(list)
@@ -68,6 +94,50 @@ def split_by_interval(df, interval, type_interval):
 
     return interval_dates
 
+def build_charts(interval_dates):
+    return {
+        interval: pd.DataFrame(
+            data=[
+                (d.strftime("%d/%m"), format_datetime(d, "EEEE", locale='pt_BR')[:3], c) 
+                for d, c in sorted(values)],
+            columns=['Data', 'Dia' , 'Execuções realizadas']
+        ) for interval, values in interval_dates.items()
+    }
+
+def interval_bounds(interval_dates, option_type):
+    date_max = max(interval_dates[option_type], key=lambda x: x[0])[0]
+    date_min = min(interval_dates[option_type], key=lambda x: x[0])[0]
+    return date_min, date_max
+
+def interval_type(filter_option):
+    # "Por semana" -> "Semana"
+    return filter_option[4:].capitalize()
+
+def select_intervals(df, selected_state, filter_option):
+    df = process_data_state(df, selected_state=selected_state)
+    interval_dates = split_by_interval(df, interval=DAYS_MAP[filter_option], type_interval=interval_type(filter_option))
+    return df, interval_dates
+
+def build_view(df, interval_dates, filter_type_data, selected_state, option_type=None):
+    # Sem option_type, usa o período mais recente (o primeiro, selecionado por padrão na sidebar)
+    option_type = option_type or next(iter(interval_dates))
+    charts = build_charts(interval_dates)
+    date_min, date_max = interval_bounds(interval_dates, option_type)
+    cumulative_sum, delta = info_delta(charts, index_atual=list(charts.keys()).index(option_type))
+
+    return {
+        "option_type": option_type,
+        "charts": charts,
+        "chart": charts[option_type] if len(charts) else {},
+        "date_min": date_min,
+        "date_max": date_max,
+        "title": f"{selected_state}: {option_type} [{date_min.strftime('%d/%m')} - {date_max.strftime('%d/%m')}] ({filter_type_data})  ",
+        "cumulative_sum": cumulative_sum,
+        "delta": delta,
+        "df_filter": df[(df['timeStamp'].dt.date >= date_min) & (df['timeStamp'].dt.date <= date_max)],
+        "show_map": filter_type_data != 'Com token',
+    }
+
 def metricHours(cumulative_sum):
     hours = cumulative_sum * 2.5
     if hours == int(hours):
@@ -105,7 +175,7 @@ def metrics_cards(cumulative_sum, title, delta=None, color='gray'):
         count = metricCounts(cumulative_sum)
         st.metric(label=f":{color}[ :material/left_click:  Cálculos realizados]", value=count, delta=delta )
 
-def info_cards(dfs, index_atual, title= ''):
+def info_delta(dfs, index_atual):
     delta = 0
     keys = list(dfs.keys())
     df = dfs[keys[index_atual]]
@@ -117,14 +187,18 @@ def info_cards(dfs, index_atual, title= ''):
         delta= f"{delta:_.2f} %"
         delta = delta.replace(".", ",").replace("_", ".")
 
-    metrics_cards(cumulative_sum, title, delta)
+    return cumulative_sum, delta
 
 
-def map(df):
+def map_data(df):
     df = df[df['state'] != "Não informado"]
 
     df_map=df.groupby('state').agg({'Execuções realizadas': 'sum'}).reset_index()
     df_map['Execuções realizadas'] = df_map['Execuções realizadas'].astype(int)
+    return df_map
+
+def figure_map(df):
+    df_map = map_data(df)
     with open('br_states.json', 'r', encoding='utf-8') as f:
         brasil_geo = json.load(f)
     
@@ -145,15 +219,23 @@ def map(df):
     # Ajustar layout do mapa
     fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0})
 
+    return fig, df_map
+
+def map(df):
+    fig, df_map = figure_map(df)
+
     # Mostrar o mapa no Streamlit
     st.plotly_chart(fig)
 
     return df_map
 
-def bar_hour(df):
-
+def hour_data(df):
     df['hour'] = df['timeStamp'].dt.strftime('%H:00')  # Formatar como 'HH:00'
-    execucoes_por_hora = df.groupby('hour').size().reset_index(name='execucoes')
+    return df.groupby('hour')['quantidade'].sum().reset_index(name='execucoes')
+
+def figure_bar_hour(df):
+
+    execucoes_por_hora = hour_data(df)
 
     fig = px.bar(
         execucoes_por_hora,
@@ -164,7 +246,27 @@ def bar_hour(df):
         color_continuous_scale='Blues'
     )
 
-    st.plotly_chart(fig)
+    return fig
+
+def bar_hour(df):
+    st.plotly_chart(figure_bar_hour(df))
+
+def figure_line(chart, filter_option):
+    fig = px.line(chart, x='Dia' if interval_type(filter_option) == 'Semana' else 'Data', y='Execuções realizadas', markers=True, text='Execuções realizadas')
+    fig.update_traces(textposition='top center', textfont_size=16)
+    return fig
+
+def figure_bar_period(charts):
+    charts = {key: charts[key] for key in sorted(charts)[:8]}
+    bar = pd.DataFrame(data=[(key, sum(v['Execuções realizadas'])) for key, v in charts.items()], columns=['Período', 'Quantidade de execuções'])
+    fig = px.bar(
+            bar, 
+            y='Período', 
+            x='Quantidade de execuções', 
+            text='Quantidade de execuções',
+            orientation='h')
+    fig.update_traces(textposition='outside', textfont_size=16)
+    return fig
 
 
 if __name__ == "__main__":
@@ -195,15 +297,7 @@ if __name__ == "__main__":
         ("Por semana", "Por mês", "Por trimestre")
     )
 
-    # Mapear a opção selecionada para um número de dias
-    days_map = {
-        "Por semana": 7,
-        "Por mês": 30,
-        "Por trimestre": 90
-    }
-    days = days_map[filter_option]
-    df = process_data_state(df, selected_state=selected_state)
-    interval_dates = split_by_interval(df, interval=days, type_interval=filter_option[4:].capitalize())
+    df, interval_dates = select_intervals(df, selected_state, filter_option)
 
     option_type = st.sidebar.selectbox(
         f"Selecione {filter_option[4:]}",
@@ -212,49 +306,23 @@ if __name__ == "__main__":
     store = f"{option_type}{filter_option}{selected_state}{filter_type_data}.pkl"
     store = unidecode(store.replace(" ", "").lower())
 
-    charts = {
-        interval: pd.DataFrame(
-            data=[
-                (d.strftime("%d/%m"), format_datetime(d, "EEEE", locale='pt_BR')[:3], c) 
-                for d, c in sorted(values)],
-            columns=['Data', 'Dia' , 'Execuções realizadas']
-        ) for interval, values in interval_dates.items()
-    }
+    view = build_view(df, interval_dates, filter_type_data, selected_state, option_type)
 
+    metrics_cards(view["cumulative_sum"], view["title"], view["delta"])
 
-    date_max = max(interval_dates[option_type], key=lambda x: x[0])[0]
-    date_min = min(interval_dates[option_type], key=lambda x: x[0])[0]
-
-    chart = charts[option_type] if len(charts) else {}
-    title = f"{selected_state}: {option_type} [{date_min.strftime('%d/%m')} - {date_max.strftime('%d/%m')}] ({filter_type_data})  "
-
-    info_cards(charts, index_atual=list(charts.keys()).index(option_type), title=title)
 
-
-    fig = px.line(chart, x='Dia' if filter_option[4:].capitalize() == 'Semana' else 'Data', y='Execuções realizadas', markers=True, text='Execuções realizadas')
-    fig.update_traces(textposition='top center', textfont_size=16)
-    st.plotly_chart(fig)
+    st.plotly_chart(figure_line(view["chart"], filter_option))
     
-    df_filter = df[(df['timeStamp'].dt.date >= date_min) & (df['timeStamp'].dt.date <= date_max)]
-    if filter_type_data != 'Com token':
-        df_map = map(df_filter)
+    if view["show_map"]:
+        df_map = map(view["df_filter"])
 
-    bar_hour(df_filter)
+    bar_hour(view["df_filter"])
 
     metrics_cards(int(sum(df['Execuções realizadas'])), title="Panorama Geral", color="blue")
 
     col1, col2 = st.columns(2)
     with col1:
-        charts = {key: charts[key] for key in sorted(charts)[:8]}
-        bar = pd.DataFrame(data=[(key, sum(v['Execuções realizadas'])) for key, v in charts.items()], columns=['Período', 'Quantidade de execuções'])
-        fig = px.bar(
-                bar, 
-                y='Período', 
-                x='Quantidade de execuções', 
-                text='Quantidade de execuções',
-                orientation='h')
-        fig.update_traces(textposition='outside', textfont_size=16)
-        st.plotly_chart(fig)
+        st.plotly_chart(figure_bar_period(view["charts"]))
     with col2:
         bar_hour(df)
 
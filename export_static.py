@@ -0,0 +1,173 @@
+"""Exporta a visão padrão do painel como HTML estático + JSON das figuras.
+
+A maior parte dos acessos usa a visão padrão ("Aberto ao público", "Geral",
+semana mais recente). Este script a pré-renderiza para que um servidor de
+arquivos simples atenda esse tráfego sem executar Python por visitante.
+
+    python export_static.py                 # gera uma vez em ./static
+    python export_static.py --watch         # regenera a cada atualização dos dados
+"""
+import argparse
+import html
+import logging
+import os
+import shutil
+import time
+
+import orjson
+import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
+
+from app import (
+    build_view,
+    figure_bar_hour,
+    figure_bar_period,
+    figure_line,
+    figure_map,
+    loading_data,
+    loading_html,
+    metricCounts,
+    metricHours,
+    metricMoney,
+    process_data_type_visualization,
+    select_intervals,
+)
+
+DEFAULT_TYPE_DATA = "Aberto ao público"
+DEFAULT_STATE = "Geral"
+DEFAULT_INTERVAL = "Por semana"
+
+# Mesmo TTL do cache de loading_data
+REFRESH_SECONDS = 60*5
+
+# Mesma versão do plotly.js embutido no plotly instalado, que gerou o JSON das figuras
+PLOTLY_JS = f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+# Cada exportação vai para output/builds/<versão>; mantemos a anterior para quem
+# ainda está carregando a página antiga
+KEEP_BUILDS = 2
+
+
+def write_atomic(path, content):
+    # Escreve em arquivo temporário e troca, para o servidor nunca servir um arquivo pela metade
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+def serialize_figure(fig):
+    return pio.to_json(fig, validate=False).encode('utf-8')
+
+def metric_values(cumulative_sum, title, delta=None):
+    return {
+        "title": title,
+        "money": f"R$ {metricMoney(cumulative_sum)}",
+        "hours": f"{metricHours(cumulative_sum)} horas",
+        "count": metricCounts(cumulative_sum),
+        "delta": delta,
+    }
+
+def render_view(df, filter_type_data=DEFAULT_TYPE_DATA, selected_state=DEFAULT_STATE, filter_option=DEFAULT_INTERVAL):
+    df = process_data_type_visualization(df, filter_type_data)
+    df, interval_dates = select_intervals(df, selected_state, filter_option)
+    view = build_view(df, interval_dates, filter_type_data, selected_state)
+
+    figures = {"line": figure_line(view["chart"], filter_option)}
+    if view["show_map"]:
+        figures["map"], _ = figure_map(view["df_filter"])
+    figures["bar_hour"] = figure_bar_hour(view["df_filter"])
+    figures["bar_period"] = figure_bar_period(view["charts"])
+    figures["bar_hour_total"] = figure_bar_hour(df)
+
+    metrics = [
+        metric_values(view["cumulative_sum"], view["title"], view["delta"]),
+        metric_values(int(sum(df['Execuções realizadas'])), "Panorama Geral"),
+    ]
+    return figures, metrics
+
+def render_metrics_html(metrics):
+    blocks = []
+    for m in metrics:
+        delta = f'<small>{html.escape(m["delta"])}</small>' if m["delta"] else ""
+        blocks.append(f"""
+<h3>{html.escape(m["title"])}</h3>
+<div class="metrics">
+  <div><span>Impacto econômico</span><strong>{html.escape(m["money"])}</strong></div>
+  <div><span>Custo de oportunidade</span><strong>{html.escape(m["hours"])}</strong></div>
+  <div><span>Cálculos realizados</span><strong>{html.escape(m["count"])}</strong>{delta}</div>
+</div>""")
+    return "".join(blocks)
+
+def render_page(figures, metrics, header, build):
+    divs = "\n".join(f'<div id="{name}" class="figure"></div>' for name in figures)
+    names = orjson.dumps(list(figures)).decode('utf-8')
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<script src="{PLOTLY_JS}"></script>
+<style>
+    .metrics {{ display: flex; gap: 2rem; }}
+    .metrics div {{ display: flex; flex-direction: column; }}
+</style>
+</head>
+<body>
+{header}
+{render_metrics_html(metrics)}
+{divs}
+<script>
+{names}.forEach(function (name) {{
+    fetch("builds/{build}/figures/" + name + ".json")
+        .then(function (r) {{ return r.json(); }})
+        .then(function (fig) {{ Plotly.newPlot(name, fig.data, fig.layout); }});
+}});
+</script>
+</body>
+</html>
+"""
+
+def prune_builds(builds_dir):
+    for build in sorted(os.listdir(builds_dir))[:-KEEP_BUILDS]:
+        shutil.rmtree(os.path.join(builds_dir, build), ignore_errors=True)
+
+def export(output="static"):
+    figures, metrics = render_view(loading_data())
+
+    # As figuras vão para um diretório novo; só a troca do index.html (que já traz
+    # os cards), feita por último, publica a exportação inteira de uma vez
+    build = str(time.time_ns())
+    builds_dir = os.path.join(output, "builds")
+    build_dir = os.path.join(builds_dir, build)
+    os.makedirs(os.path.join(build_dir, "figures"))
+    try:
+        for name, fig in figures.items():
+            with open(os.path.join(build_dir, "figures", f"{name}.json"), 'wb') as f:
+                f.write(serialize_figure(fig))
+    except Exception:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    write_atomic(os.path.join(output, "index.html"), render_page(figures, metrics, loading_html(), build).encode('utf-8'))
+    prune_builds(builds_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta a visão padrão do painel como arquivos estáticos.")
+    parser.add_argument("--output", default="static", help="Diretório de saída")
+    parser.add_argument("--watch", action="store_true", help="Regenera a cada atualização dos dados")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        try:
+            export(args.output)
+        except Exception:
+            if not args.watch:
+                raise
+            # Mantém a última exportação publicada e tenta de novo na próxima atualização
+            logging.exception("Falha ao exportar; nova tentativa em %s segundos", REFRESH_SECONDS)
+        if not args.watch:
+            break
+        time.sleep(REFRESH_SECONDS)
+        loading_data.clear()
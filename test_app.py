@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import (
+    DAYS_MAP,
+    build_view,
+    compact_data,
+    hour_data,
+    map_data,
+    process_data_type_visualization,
+    select_intervals,
+)
+
+STATES = ["AL", "PE", "SP", "Não informado"]
+
+
+def synthetic_executions(durations, n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp.now(tz='America/Sao_Paulo')
+    start = pd.Timestamp(2024, 7, 1, tz='America/Sao_Paulo')
+    seconds = rng.integers(0, int((now - start).total_seconds()), n)
+    return pd.DataFrame({
+        'timeStamp': start + pd.to_timedelta(seconds, unit='s'),
+        'state': rng.choice(STATES, n),
+        'Execuções realizadas': rng.choice(durations, n).astype(float),
+    })
+
+def view_results(df, filter_type_data, selected_state, filter_option):
+    df = process_data_type_visualization(df, filter_type_data)
+    df, interval_dates = select_intervals(df, selected_state, filter_option)
+    results = {"intervals": dict(interval_dates)}
+    for option_type in interval_dates:
+        view = build_view(df, interval_dates, filter_type_data, selected_state, option_type)
+        results[option_type] = (
+            view["cumulative_sum"],
+            view["delta"],
+            map_data(view["df_filter"]).to_dict('list'),
+            hour_data(view["df_filter"].copy()).to_dict('list'),
+        )
+    results["panorama"] = int(sum(df['Execuções realizadas']))
+    results["hours"] = hour_data(df.copy()).to_dict('list')
+    return results
+
+
+@pytest.mark.parametrize("durations", [[1], [1, 2, 3], [0.5, 1.3, 2.7]], ids=["unit", "int", "float"])
+def test_compact_data_keeps_view_results(durations):
+    raw = synthetic_executions(durations)
+    compacted = compact_data(raw)
+
+    # As duas camadas de fato existem
+    assert (compacted['quantidade'] > 1).any()
+    assert (compacted['quantidade'] == 1).any()
+    assert len(compacted) < len(raw)
+
+    # Antes da compactação cada linha era uma execução
+    baseline = raw.assign(quantidade=1)
+    for filter_type_data in ("Aberto ao público", "Dados totais", "Com token"):
+        for selected_state in ["Geral"] + STATES[:-1]:
+            for filter_option in DAYS_MAP:
+                assert view_results(compacted, filter_type_data, selected_state, filter_option) \
+                    == view_results(baseline, filter_type_data, selected_state, filter_option)
+
+def test_compact_data_daily_counts_match_value_counts():
+    raw = synthetic_executions([1, 2, 3])
+    compacted = compact_data(raw)
+
+    assert compacted.groupby(compacted['timeStamp'].dt.date)['quantidade'].sum().to_dict() \
+        == raw['timeStamp'].dt.date.value_counts().to_dict()